@@ -7,18 +7,28 @@
 
 from __future__ import annotations
 
+import gc
+import os
+import re
+import tempfile
 import time
 import json
-import traceback
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from html import unescape
+from io import BytesIO, StringIO
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from urllib.parse import quote
 
+import pandas as pd  # streamlit 의존성으로 항상 설치됨
 import streamlit as st
 
 # Optional imports (앱 안죽게)
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except Exception:
     requests = None
 
@@ -27,14 +37,33 @@ try:
 except Exception:
     xmltodict = None
 
+try:
+    from lxml import etree
+except Exception:
+    etree = None
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except Exception:
+    HTMLParser = None
+
+try:
+    import diskcache
+except Exception:
+    diskcache = None
+
 
 # -------------------------
 # Page config & styles
 # -------------------------
 st.set_page_config(page_title="AI 행정관 Pro v9", page_icon="🏛️", layout="wide")
 
-st.markdown(
-    """
+_CSS_BLOCK = """
 <style>
 .stApp { background-color: #f3f4f6; }
 .paper {
@@ -85,9 +114,10 @@ st.markdown(
 }
 hr.sep { border:none; border-top:1px solid #e5e7eb; margin: 16px 0; }
 </style>
-""",
-    unsafe_allow_html=True,
-)
+"""
+
+# 스트림릿은 rerun마다 화면을 다시 그리므로 주입 자체는 매번 필요(캐시하면 두 번째 rerun부터 스타일이 사라짐)
+st.markdown(_CSS_BLOCK, unsafe_allow_html=True)
 
 st.title("AI 행정관 Pro v9")
 st.caption("클릭형 근거(법령 원문/사례) + Verifier(기본) + 성능 대시보드(눈으로 확인)")
@@ -96,18 +126,23 @@ st.caption("클릭형 근거(법령 원문/사례) + Verifier(기본) + 성능 
 # -------------------------
 # Secrets reader (general/law 둘다 지원)
 # -------------------------
-def _get_secret(paths: List[Tuple[str, str]]) -> Optional[str]:
+def _secrets_snapshot() -> Dict[str, Any]:
+    # st.secrets 프록시를 한 번만 훑어서 평범한 dict로 복사(키 조회마다 프록시 접근 안 함)
+    try:
+        return {k: dict(v) if hasattr(v, "items") else v for k, v in st.secrets.items()}
+    except Exception:
+        return {}
+
+
+def _get_secret(secrets: Dict[str, Any], paths: List[Tuple[str, str]]) -> Optional[str]:
     """
     paths: [(section, key), ...]
     """
     for section, key in paths:
-        try:
-            sec = st.secrets.get(section, {})
-            val = sec.get(key)
-            if isinstance(val, str) and val.strip():
-                return val.strip()
-        except Exception:
-            pass
+        sec = secrets.get(section, {})
+        val = sec.get(key) if isinstance(sec, dict) else None
+        if isinstance(val, str) and val.strip():
+            return val.strip()
     return None
 
 
@@ -119,15 +154,17 @@ class Config:
 
 
 def load_config() -> Config:
+    secrets = _secrets_snapshot()
     law_api_id = _get_secret(
+        secrets,
         [
             ("law", "LAW_API_ID"),
             ("general", "LAW_API_ID"),
             ("general", "LAW_API_ID "),
-        ]
+        ],
     )
-    naver_client_id = _get_secret([("naver", "CLIENT_ID"), ("general", "CLIENT_ID")])
-    naver_client_secret = _get_secret([("naver", "CLIENT_SECRET"), ("general", "CLIENT_SECRET")])
+    naver_client_id = _get_secret(secrets, [("naver", "CLIENT_ID"), ("general", "CLIENT_ID")])
+    naver_client_secret = _get_secret(secrets, [("naver", "CLIENT_SECRET"), ("general", "CLIENT_SECRET")])
     return Config(
         law_api_id=law_api_id,
         naver_client_id=naver_client_id,
@@ -141,18 +178,39 @@ cfg = load_config()
 # -------------------------
 # Perf tracker
 # -------------------------
+PERF_MAX_CALLS = 256
+
+
+def _new_perf() -> Dict[str, Any]:
+    return {
+        "calls": deque(maxlen=PERF_MAX_CALLS),  # (name, ok, ms) 최근 N개만 유지
+    }
+
+
+def _reset_perf():
+    st.session_state.perf = _new_perf()
+
+
 def ss_init():
     if "perf" not in st.session_state:
-        st.session_state.perf = {
-            "calls": [],  # list of dicts {name, ok, ms}
-            "counters": {},  # name -> count
-        }
+        st.session_state.perf = _new_perf()
 
 
 def perf_mark(name: str, ok: bool, ms: float):
+    # 대시보드에서 기록을 끄면 아무것도 안 함(session_state 변경 없음)
+    if not st.session_state.get("metrics_on", True):
+        return
     ss_init()
-    st.session_state.perf["calls"].append({"name": name, "ok": ok, "ms": ms})
-    st.session_state.perf["counters"][name] = st.session_state.perf["counters"].get(name, 0) + 1
+    st.session_state.perf["calls"].append((name, ok, ms))
+
+
+def gc_after_action(every: int = 4):
+    # 무거운 액션(검색/조문/초안) 직후에만 full collect. 매 클릭마다 돌리면 오히려 멈춤이 생김
+    # 성능 기록이 꺼져 있어도 동작하도록 별도 카운터 사용
+    n = st.session_state.get("gc_ticks", 0) + 1
+    st.session_state.gc_ticks = n
+    if n % every == 0:
+        gc.collect(2)
 
 
 class Timer:
@@ -178,6 +236,10 @@ with st.expander("🔎 시스템 진단(먼저 여기부터 봐야 함)"):
     with c1:
         st.write("requests 설치:", bool(requests))
         st.write("xmltodict 설치:", bool(xmltodict))
+        st.write("lxml 설치(조문 파싱 가속):", bool(etree))
+        st.write("orjson 설치(캐시 직렬화 가속):", bool(orjson))
+        st.write("selectolax 설치(뉴스 태그 제거 가속):", bool(HTMLParser))
+        st.write("diskcache 설치(DRF 디스크 캐시):", bool(diskcache))
     with c2:
         st.write("LAW_API_ID 감지:", bool(cfg.law_api_id))
         st.code(f"LAW_API_ID = {('SET' if cfg.law_api_id else 'MISSING')}")
@@ -209,6 +271,80 @@ LAW_SEARCH_URL = "https://www.law.go.kr/DRF/lawSearch.do"
 LAW_SERVICE_URL = "https://www.law.go.kr/DRF/lawService.do"
 
 
+@st.cache_resource(show_spinner=False)
+def get_http() -> "requests.Session":
+    # DRF/NAVER 모두 HTTPS -> 커넥션 재사용으로 TLS 핸드셰이크 반복 제거
+    # rerun마다 모듈이 다시 돌기 때문에 cache_resource로 프로세스당 1개만 유지
+    sess = requests.Session()
+    # Retry-After는 무시(상한 없이 sleep -> timeout=12 예산 초과) / 재시도 소진 시 RetryError 대신
+    # 마지막 응답을 그대로 돌려줘서 호출부 raise_for_status()가 실제 HTTP 상태를 보여주게 함
+    retry = Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+    sess.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+    # NAVER 429는 대개 일일 쿼터 소진 -> 재시도해도 지연만 늘어나므로 5xx만 재시도
+    naver_retry = retry.new(status_forcelist=(500, 502, 503, 504))
+    sess.mount("https://openapi.naver.com/", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=naver_retry))
+    sess.headers.update({"User-Agent": "ai-haengjeonggwan/9.0", "Accept-Encoding": "gzip"})
+    return sess
+
+
+DISK_CACHE_DIR = os.path.join(tempfile.gettempdir(), "law_cache")
+DISK_CACHE_TTL = 86400  # 법령 원문은 하루 단위로 거의 안 바뀜
+# 디스크 캐시 키에 포함 -> 정규화 행 구조/카드 템플릿(_normalize_laws, _LAW_CARD_TMPL)이 바뀌면 반드시 +1
+# (재배포 후에도 24h 동안 옛 행/마크업이 서빙되는 것 방지)
+_DISK_SCHEMA = 2
+
+
+@st.cache_resource(show_spinner=False)
+def get_disk_cache():
+    # 메모리(st.cache_data) -> 디스크 -> 네트워크 순. 컨테이너 재시작 후에도 DRF 재호출 방지
+    if diskcache is None:
+        return None
+    try:
+        return diskcache.Cache(
+            DISK_CACHE_DIR, size_limit=256 * 1024 * 1024, eviction_policy="least-recently-used"
+        )
+    except Exception:
+        return None
+
+
+def _disk_get(key: Tuple[Any, ...]) -> Optional[bytes]:
+    dc = get_disk_cache()
+    if dc is None:
+        return None
+    try:
+        return dc.get(key)
+    except Exception:
+        return None
+
+
+def _disk_set(key: Tuple[Any, ...], value: bytes):
+    dc = get_disk_cache()
+    if dc is None:
+        return
+    try:
+        dc.set(key, value, expire=DISK_CACHE_TTL)
+    except Exception:
+        pass
+
+
+def _jdumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _jloads(b: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(b)
+    return json.loads(b)
+
+
 def _safe_list(x):
     if x is None:
         return []
@@ -217,8 +353,14 @@ def _safe_list(x):
     return [x]
 
 
-@st.cache_data(ttl=3600, show_spinner=False)
-def drf_law_search(oc: str, query: str, display: int = 10) -> Dict[str, Any]:
+@st.cache_data(ttl=3600, max_entries=512, show_spinner=False)
+def drf_law_search(oc: str, query: str, display: int = 10) -> bytes:
+    # 정규화된 결과를 JSON bytes로 캐시(해시/직렬화 비용이 dict보다 훨씬 쌈)
+    key = ("search", _DISK_SCHEMA, oc, query, display)
+    cached = _disk_get(key)
+    if cached is not None:
+        return cached
+
     params = {
         "OC": oc,
         "target": "law",
@@ -226,38 +368,120 @@ def drf_law_search(oc: str, query: str, display: int = 10) -> Dict[str, Any]:
         "query": query,
         "display": display,
     }
-    r = requests.get(LAW_SEARCH_URL, params=params, timeout=12)
+    r = get_http().get(LAW_SEARCH_URL, params=params, timeout=12)
     r.raise_for_status()
-    return xmltodict.parse(r.text)
+    if etree is not None:
+        laws = normalize_law_search_lxml(r.content)
+    else:
+        # bytes 그대로 넘겨 expat이 C에서 한 번만 디코딩 / 속성은 안 씀
+        laws = normalize_law_search(xmltodict.parse(r.content, xml_attribs=False, force_list=("law",)))
+    out = _jdumps(laws)
+    if laws:
+        # DRF는 인증 실패 등도 200 + 오류 본문으로 응답 -> 빈 결과는 디스크에 남기지 않음
+        _disk_set(key, out)
+    return out
+
 
+def search_laws(oc: str, query: str, display: int = 10) -> List[Dict[str, str]]:
+    return _jloads(drf_law_search(oc, query, display=display))
 
-@st.cache_data(ttl=3600, show_spinner=False)
-def drf_law_service(oc: str, mst: str) -> Dict[str, Any]:
+
+def drf_law_service(oc: str, mst: str) -> bytes:
+    # 원문 XML(bytes) 그대로 반환 -> 조문 추출 단계에서 필요한 태그만 파싱
+    # 자체 캐시 없음: 유일한 호출부 law_articles가 메모리/디스크 캐시를 가짐(법령 전문 XML을 중복 보관하지 않음)
     params = {"OC": oc, "target": "law", "type": "XML", "MST": mst}
-    r = requests.get(LAW_SERVICE_URL, params=params, timeout=12)
+    r = get_http().get(LAW_SERVICE_URL, params=params, timeout=12)
     r.raise_for_status()
-    return xmltodict.parse(r.text)
+    return r.content
 
 
-def normalize_law_search(parsed: Dict[str, Any]) -> List[Dict[str, str]]:
-    root = parsed.get("LawSearch", {}) if isinstance(parsed, dict) else {}
-    laws = _safe_list(root.get("law"))
+_LAW_CARD_TMPL = """
+<div class="card">
+  <div><b>{i}. {name}</b> <span class="badge">MST {mst}</span></div>
+  <div class="small">공포일자: {promulg}</div>
+  <div style="margin-top:8px;">
+    <a href="{link}" target="_blank">원문 보기(법령정보센터)</a>
+  </div>
+</div>
+"""
+
+
+_LAW_NAME_KEYS = ("법령명한글", "법령명")
+_LAW_MST_KEYS = ("법령일련번호", "MST")
+_LAW_XP = etree.XPath("/LawSearch/law") if etree is not None else None
+
+
+def _normalize_laws(getters: Iterable[Callable[[str], Any]]) -> List[Dict[str, str]]:
+    """
+    검색 결과 정규화 + 카드 HTML(_card_html)까지 여기서 한 번만 생성.
+    - getters: law 항목별 필드 조회 함수(xmltodict dict.get / lxml findtext)
+    - 결과는 캐시되므로 rerun마다 quote/포맷팅을 다시 하지 않음
+    """
     out = []
-    for law in laws:
-        if not isinstance(law, dict):
+    for get in getters:
+        name = str(_pick(get, _LAW_NAME_KEYS)).strip()
+        mst = str(_pick(get, _LAW_MST_KEYS)).strip()
+        if not (name and mst):
             continue
-        name = law.get("법령명한글") or law.get("법령명") or ""
-        mst = law.get("법령일련번호") or law.get("MST") or ""
-        promulg = law.get("공포일자") or ""
+        promulg = str(get("공포일자") or "").strip()
+        link = f"https://www.law.go.kr/법령/{quote(name, safe='')}"
         out.append(
             {
-                "name": str(name).strip(),
-                "mst": str(mst).strip(),
-                "promulg": str(promulg).strip(),
-                "lawgo_link": f"https://www.law.go.kr/법령/{quote(str(name).strip())}" if name else "",
+                "name": name,
+                "mst": mst,
+                "promulg": promulg,
+                "lawgo_link": link,
+                "_card_html": _LAW_CARD_TMPL.format(
+                    i=len(out) + 1,
+                    name=_hesc(name),
+                    mst=_hesc(mst),
+                    promulg=_hesc(promulg),
+                    link=_hesc(link),
+                ),
             }
         )
-    return [x for x in out if x["name"] and x["mst"]]
+    return out
+
+
+def normalize_law_search(parsed: Dict[str, Any]) -> List[Dict[str, str]]:
+    root = parsed.get("LawSearch", {}) if isinstance(parsed, dict) else {}
+    laws = _safe_list(root.get("law"))
+    return _normalize_laws(law.get for law in laws if isinstance(law, dict))
+
+
+def normalize_law_search_lxml(xml_bytes: bytes) -> List[Dict[str, str]]:
+    # 필요한 law 항목만 XPath로 찾고 필드는 findtext(전체 dict 변환 없음)
+    parser = etree.XMLParser(resolve_entities=False, no_network=True)
+    root = etree.fromstring(xml_bytes, parser)
+    return _normalize_laws(el.findtext for el in _LAW_XP(root))
+
+
+# 조문 컨테이너/필드 키 후보(xmltodict dict 키 = lxml 태그명)
+_ART_KEYS = ("조문", "조문단위", "Article", "article")
+_NO_KEYS = ("조문번호", "ArticleNumber", "번호")
+_TITLE_KEYS = ("조문제목", "ArticleTitle", "제목")
+_TEXT_KEYS = ("조문내용", "ArticleContent", "내용")
+
+
+def _pick(get, keys: Tuple[str, ...]) -> Any:
+    for k in keys:
+        v = get(k)
+        if v:
+            return v
+    return ""
+
+
+def _iter_article_units(node: Any) -> Iterable[Dict[str, Any]]:
+    # <조문><조문단위>…처럼 컨테이너 안에 실제 조문이 중첩된 경우까지 펼쳐서 반환
+    for a in _safe_list(node):
+        if not isinstance(a, dict):
+            continue
+        nested = [a[k] for k in _ART_KEYS if a.get(k)]
+        if nested:
+            for n in nested:
+                yield from _iter_article_units(n)
+        else:
+            yield a
 
 
 def extract_articles(service_parsed: Dict[str, Any], max_articles: int = 30) -> List[Dict[str, str]]:
@@ -278,33 +502,80 @@ def extract_articles(service_parsed: Dict[str, Any], max_articles: int = 30) ->
         if not isinstance(root, dict):
             continue
 
-        # 자주 나오는 키 후보들
-        for key in ["조문", "조문단위", "Article", "article"]:
+        for key in _ART_KEYS:
             node = root.get(key)
             if not node:
                 continue
-            for a in _safe_list(node):
-                if not isinstance(a, dict):
+            for a in _iter_article_units(node):
+                get = a.get
+                no = str(_pick(get, _NO_KEYS)).strip()
+                title = str(_pick(get, _TITLE_KEYS)).strip()
+                text = str(_pick(get, _TEXT_KEYS)).replace("\r", "\n").strip()
+                # lxml 경로와 동일하게 빈 행(컨테이너 등)은 스킵
+                if not (no or title or text):
                     continue
-                no = a.get("조문번호") or a.get("ArticleNumber") or a.get("번호") or ""
-                title = a.get("조문제목") or a.get("ArticleTitle") or a.get("제목") or ""
-                text = a.get("조문내용") or a.get("ArticleContent") or a.get("내용") or ""
-                articles.append(
-                    {
-                        "no": str(no).strip(),
-                        "title": str(title).strip(),
-                        "text": str(text).strip(),
-                    }
-                )
+                articles.append({"no": no, "title": title, "text": text})
+                if len(articles) >= max_articles:
+                    return articles
         if articles:
             break
+    return articles
+
+
+def extract_articles_lxml(xml_bytes: bytes, max_articles: int = 30) -> List[Dict[str, str]]:
+    """
+    lxml iterparse로 조문 태그만 스트리밍 파싱.
+    - 전체 XML을 dict로 바꾸지 않음(루트 위치 탐색 불필요)
+    - 처리한 요소는 바로 비워서 메모리 평탄 유지, max_articles 도달 시 중단
+    """
+    articles: List[Dict[str, str]] = []
+    for _, el in etree.iterparse(
+        BytesIO(xml_bytes), events=("end",), tag=_ART_KEYS, huge_tree=False, recover=True
+    ):
+        get = el.findtext
+        no = _pick(get, _NO_KEYS)
+        title = _pick(get, _TITLE_KEYS)
+        text = _pick(get, _TEXT_KEYS)
+
+        el.clear()
+        while el.getprevious() is not None:
+            del el.getparent()[0]
+
+        # 조문 묶음(컨테이너) 태그는 하위가 이미 비워져 있으므로 스킵
+        if not (no or title or text):
+            continue
+        articles.append(
+            {
+                "no": no.strip(),
+                "title": title.strip(),
+                "text": text.replace("\r", "\n").strip(),
+            }
+        )
+        if len(articles) >= max_articles:
+            break
+    return articles
+
 
-    # 후처리
-    cleaned = []
-    for a in articles:
-        t = a["text"].replace("\r", "\n").strip()
-        cleaned.append({**a, "text": t})
-    return cleaned[:max_articles]
+def load_articles(xml_bytes: bytes, max_articles: int = 30) -> List[Dict[str, str]]:
+    # lxml 있으면 스트리밍 파싱, 없으면 xmltodict 경로(방어적 dict 탐색)
+    if etree is not None:
+        return extract_articles_lxml(xml_bytes, max_articles=max_articles)
+    return extract_articles(xmltodict.parse(xml_bytes, xml_attribs=False), max_articles=max_articles)
+
+
+@st.cache_data(ttl=3600, max_entries=512, show_spinner=False)
+def law_articles(oc: str, mst: str, max_articles: int = 30) -> List[Dict[str, str]]:
+    # 평탄화된 조문 리스트를 (oc, mst)로 캐시 -> 캐시 키에 원문 XML bytes 전체를 해싱하지 않음
+    key = ("articles", _DISK_SCHEMA, oc, mst, max_articles)
+    cached = _disk_get(key)
+    if cached is not None:
+        return _jloads(cached)
+
+    arts = load_articles(drf_law_service(oc, mst), max_articles=max_articles)
+    if arts:
+        # 오류 본문(조문 0개)은 디스크에 남기지 않음 -> 다음 호출에서 재조회
+        _disk_set(key, _jdumps(arts))
+    return arts
 
 
 # -------------------------
@@ -313,22 +584,85 @@ def extract_articles(service_parsed: Dict[str, Any], max_articles: int = 30) ->
 NAVER_NEWS_URL = "https://openapi.naver.com/v1/search/news.json"
 
 
-@st.cache_data(ttl=1800, show_spinner=False)
-def naver_news_search(client_id: str, client_secret: str, query: str, display: int = 10) -> Dict[str, Any]:
+@st.cache_data(ttl=1800, max_entries=512, show_spinner=False)
+def naver_news_search(client_id: str, client_secret: str, query: str, display: int = 10) -> bytes:
     headers = {
         "X-Naver-Client-Id": client_id,
         "X-Naver-Client-Secret": client_secret,
     }
     params = {"query": query, "display": display, "sort": "sim"}
-    r = requests.get(NAVER_NEWS_URL, headers=headers, params=params, timeout=12)
+    r = get_http().get(NAVER_NEWS_URL, headers=headers, params=params, timeout=12)
     r.raise_for_status()
-    return r.json()
+    # 정규화 + 카드 HTML까지 캐시에 넣음 -> 캐시 hit이면 bytes 디코딩만
+    return _jdumps(normalize_news_items(_jloads(r.content)))
+
+
+def search_news(client_id: str, client_secret: str, query: str, display: int = 10) -> List[Dict[str, str]]:
+    return _jloads(naver_news_search(client_id, client_secret, query, display=display))
+
+
+_TAG_RE = re.compile(r"<[^>]+>")
 
 
 def strip_html_tags(s: str) -> str:
-    # 간단 제거(뉴스 API title/desc에 <b> 태그가 들어옴)
-    import re
-    return re.sub(r"<[^>]+>", "", s or "").strip()
+    # 뉴스 API title/desc에 <b> 태그 + &quot; 같은 엔티티가 들어옴 -> 태그 제거 + 엔티티 디코딩
+    if not s:
+        return ""
+    if HTMLParser is not None:
+        return HTMLParser(s).text().strip()
+    return unescape(_TAG_RE.sub("", s)).strip()
+
+
+_HTML_ESCAPE_TT = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"})
+
+
+def _hesc(s: str) -> str:
+    # html.escape(quote=True)와 동일 결과, replace 5번 대신 translate 1회
+    return s.translate(_HTML_ESCAPE_TT)
+
+
+_EXAMPLE_CARD_TMPL = """
+<div class="card">
+  <div><b>{title}</b></div>
+  <div class="small">{desc}</div>
+  <div style="margin-top:8px;">
+    <a href="{link}" target="_blank">원문 보기</a>
+  </div>
+</div>
+"""
+
+
+def normalize_news_items(j: Dict[str, Any]) -> List[Dict[str, str]]:
+    items = j.get("items", []) if isinstance(j, dict) else []
+    out = []
+    for it in items:
+        title = strip_html_tags(it.get("title", ""))
+        link = it.get("originallink") or it.get("link") or ""
+        if not (title and link):
+            continue
+        desc = strip_html_tags(it.get("description", ""))
+        out.append(
+            {
+                "title": title,
+                "desc": desc,
+                "link": link,
+                "pubDate": it.get("pubDate", ""),
+                "_card_html": _EXAMPLE_CARD_TMPL.format(title=_hesc(title), desc=_hesc(desc), link=_hesc(link)),
+            }
+        )
+    return out
+
+
+def clear_api_caches():
+    # 메모리(st.cache_data) + 디스크 캐시 모두 비움 -> 다음 호출은 DRF/NAVER 재조회
+    for fn in (drf_law_search, law_articles, naver_news_search):
+        fn.clear()
+    dc = get_disk_cache()
+    if dc is not None:
+        try:
+            dc.clear()
+        except Exception:
+            pass
 
 
 # -------------------------
@@ -348,6 +682,7 @@ CLIENT_SECRET = "..."
 """
     )
     st.write("※ secrets.toml은 반드시 따옴표 닫힘(문자열 끝) 확인")
+    st.button("🗑️ 법령/사례 캐시 비우기(최신 원문 다시 받기)", on_click=clear_api_caches)
 
 
 # -------------------------
@@ -391,17 +726,47 @@ with right:
 # -------------------------
 # Actions
 # -------------------------
+# 행정 민원에서 자주 나오는 법령 검색용 키워드(어간)
+_QUERY_STEMS = frozenset(
+    {
+        "건설기계", "주기", "과태료", "행정처분", "도로", "사유지", "공유지", "주차", "주정차",
+        "방치", "무단", "불법", "단속", "자동차", "차량", "견인", "소음", "건축", "폐기물",
+        "옥외광고물", "점용", "영업", "허가", "신고", "위반",
+    }
+)
+_TOKEN_RE = re.compile(r"[가-힣]{2,6}")
+
+
+def _match_stem(tok: str) -> Optional[str]:
+    # 조사/어미가 붙은 토큰("주기되었고", "건설기계가")도 잡히도록 가장 긴 접두어 매칭
+    for n in range(len(tok), 1, -1):
+        if tok[:n] in _QUERY_STEMS:
+            return tok[:n]
+    return None
+
+
 def build_query(case_text: str, hint: str) -> str:
     base = (hint or "").strip()
     if base:
         return base
-    # 힌트 없으면 상황에서 핵심 단어만 대충 끌어올림(안전한 기본)
+    # 힌트 없으면 상황에서 핵심 단어만 끌어올림(안전한 기본)
     # 실무상은 사용자가 힌트 넣는게 정확도가 가장 좋음.
     t = (case_text or "").strip()
     if not t:
         return ""
-    # 너무 길면 앞부분만
-    return t[:60]
+    seen = set()
+    stems: List[str] = []
+    for m in _TOKEN_RE.finditer(t):
+        stem = _match_stem(m.group())
+        if stem and stem not in seen:
+            seen.add(stem)
+            stems.append(stem)
+            if len(stems) >= 3:
+                break
+    if stems:
+        return " ".join(stems)
+    # 키워드가 없으면 앞부분만
+    return t[:40]
 
 
 if do_search:
@@ -412,8 +777,7 @@ if do_search:
         with st.spinner("LAW.go.kr DRF에서 법령 검색 중..."):
             try:
                 with Timer("drf_law_search"):
-                    parsed = drf_law_search(cfg.law_api_id, q, display=10)
-                laws = normalize_law_search(parsed)
+                    laws = search_laws(cfg.law_api_id, q, display=10)
                 st.session_state.last_laws = laws
 
                 if not laws:
@@ -424,8 +788,10 @@ if do_search:
                 else:
                     st.success(f"법령 {len(laws)}건 발견")
             except Exception as e:
+                import traceback  # 에러 경로에서만 필요
                 st.error(f"법령 검색 실패: {e}")
                 st.code(traceback.format_exc())
+        gc_after_action()
 
 
 if do_examples:
@@ -441,58 +807,61 @@ if do_examples:
             with st.spinner("네이버 뉴스에서 사례 검색 중..."):
                 try:
                     with Timer("naver_news_search"):
-                        j = naver_news_search(cfg.naver_client_id, cfg.naver_client_secret, nq, display=10)
-                    items = j.get("items", []) if isinstance(j, dict) else []
-                    examples = []
-                    for it in items:
-                        examples.append(
-                            {
-                                "title": strip_html_tags(it.get("title", "")),
-                                "desc": strip_html_tags(it.get("description", "")),
-                                "link": it.get("originallink") or it.get("link") or "",
-                                "pubDate": it.get("pubDate", ""),
-                            }
+                        st.session_state.last_examples = search_news(
+                            cfg.naver_client_id, cfg.naver_client_secret, nq, display=10
                         )
-                    st.session_state.last_examples = [x for x in examples if x["title"] and x["link"]]
                     if not st.session_state.last_examples:
                         st.warning("사례 검색 결과가 없습니다.")
                     else:
                         st.success(f"사례 {len(st.session_state.last_examples)}건 확보")
                 except Exception as e:
+                    import traceback  # 에러 경로에서만 필요
                     st.error(f"사례 검색 실패: {e}")
                     st.code(traceback.format_exc())
+            gc_after_action()
 
 
-def a4_render(title: str, meta: Dict[str, str], body_paragraphs: List[str]):
-    body_html = "".join(
-        f"<p style='margin:0 0 14px 0; text-indent: 12px;'>{st._utils.escape_markdown(p)}</p>"
-        for p in body_paragraphs
-    )
-    # Streamlit escape_markdown은 HTML 이스케이프가 아님. 그러므로 여기서는 단순 text만 넣음.
-    # -> 안전하게 다시 구성:
-    import html as _html
+def _a4_height(body_paragraphs: List[str]) -> int:
+    # 제목/메타/서명 영역 + 문단별(줄바꿈 약 36자 기준, 줄당 ~26px + 문단 간격 14px)
+    # 좁은/모바일 컬럼에선 줄바꿈이 더 많아져 추정이 모자람 -> 호출부에서 scrolling은 켜둠
+    return 260 + sum(14 + 26 * (len(p) // 36 + 1) for p in body_paragraphs)
 
-    body_html = "".join(
-        f"<p style='margin:0 0 14px 0; text-indent: 12px;'>{_html.escape(p)}</p>"
-        for p in body_paragraphs
-    )
 
-    html = f"""
+_A4_P_TMPL = "<p style='margin:0 0 14px 0; text-indent: 12px;'>%s</p>"
+_A4_TMPL = """
 <div class="paper">
-  <div class="h1">{_html.escape(title)}</div>
+  <div class="h1">{title}</div>
   <div class="meta">
-    문서번호: {_html.escape(meta.get("doc_no",""))} &nbsp; | &nbsp;
-    시행일자: {_html.escape(meta.get("date",""))} &nbsp; | &nbsp;
-    담당부서: {_html.escape(meta.get("dept",""))}
+    문서번호: {doc_no} &nbsp; | &nbsp;
+    시행일자: {date} &nbsp; | &nbsp;
+    담당부서: {dept}
   </div>
-  {body_html}
+  {body}
   <div style="margin-top:80px; text-align:right;">
-    {_html.escape(meta.get("date",""))}<br/>
-    {_html.escape(meta.get("org","충주시청"))}
+    {date}<br/>
+    {org}
   </div>
 </div>
 """
-    st.components.v1.html(html, height=1000, scrolling=True)
+
+
+def a4_render(title: str, meta: Dict[str, str], body_paragraphs: List[str]):
+    tt = _HTML_ESCAPE_TT
+    buf = StringIO()
+    w = buf.write
+    for p in body_paragraphs:
+        w(_A4_P_TMPL % p.translate(tt))
+
+    mget = meta.get
+    html = _A4_TMPL.format(
+        title=title.translate(tt),
+        doc_no=mget("doc_no", "").translate(tt),
+        date=mget("date", "").translate(tt),
+        dept=mget("dept", "").translate(tt),
+        org=mget("org", "충주시청").translate(tt),
+        body=buf.getvalue(),
+    )
+    st.components.v1.html(html, height=_a4_height(body_paragraphs), scrolling=True)
     st.download_button(
         "📥 공문 HTML 다운로드",
         data=html,
@@ -512,8 +881,7 @@ if do_draft:
         if not st.session_state.last_laws:
             try:
                 with Timer("drf_law_search(auto)"):
-                    parsed = drf_law_search(cfg.law_api_id, q, display=5)
-                st.session_state.last_laws = normalize_law_search(parsed)
+                    st.session_state.last_laws = search_laws(cfg.law_api_id, q, display=5)
             except Exception:
                 st.session_state.last_laws = []
 
@@ -521,9 +889,10 @@ if do_draft:
         if st.session_state.last_laws:
             law_line = f"관련 법령으로는 '{st.session_state.last_laws[0]['name']}' 등이 검토 대상입니다."
 
+        now = datetime.now()
         meta = {
-            "doc_no": f"draft-{datetime.now().strftime('%Y%m%d-%H%M%S')}",
-            "date": datetime.now().strftime("%Y.%m.%d"),
+            "doc_no": f"draft-{now:%Y%m%d-%H%M%S}",
+            "date": f"{now:%Y.%m.%d}",
             "dept": "차량민원과(예시)",
             "org": "충주시청",
         }
@@ -537,6 +906,7 @@ if do_draft:
             "- 사실관계 확인 → 관련 법령 적용 가능 여부 검토 → 행정지도/계도 또는 법령상 조치 절차 진행(해당 시).",
             "6. 추가 문의는 담당부서로 연락주시기 바랍니다.",
         ]
+        gc_after_action()
         with right:
             st.subheader("📄 공문(초안) 미리보기")
             a4_render("민원 처리 검토 결과(초안)", meta, body)
@@ -545,38 +915,42 @@ if do_draft:
 # -------------------------
 # Render results in right panel
 # -------------------------
-with right:
-    # 법령 목록
-    if st.session_state.last_laws:
+# 위젯이 있는 영역(법령 선택/조문 로드, 성능 대시보드)은 fragment로 분리
+# -> 해당 영역 안의 클릭은 그 fragment만 다시 실행(사례 카드/다른 영역 재렌더 없음)
+def render_articles(law: Optional[Dict[str, str]], arts: List[Dict[str, str]]):
+    if not law:
+        return
+    st.markdown("### 🧾 조문(클릭해서 원문 확인 권장)")
+    st.markdown(f"**선택 법령:** {law['name']}  \n[원문 열기]({law['lawgo_link']})")
+
+    if arts:
+        for a in arts:
+            title = f"제{a.get('no','?')}조 {a.get('title','')}".strip()
+            with st.expander(title):
+                st.write(a.get("text", "")[:5000] if a.get("text") else "(내용 없음)")
+    else:
+        st.info("조문을 불러오지 않았거나, 구조 차이로 파싱이 비었습니다. 위 원문 링크로 확인하세요.")
+
+
+@st.fragment
+def render_laws(laws: List[Dict[str, str]]):
+    if laws:
         st.markdown("### 📚 법령 후보(원문 클릭)")
-        for i, law in enumerate(st.session_state.last_laws, start=1):
-            st.markdown(
-                f"""
-<div class="card">
-  <div><b>{i}. {law['name']}</b> <span class="badge">MST {law['mst']}</span></div>
-  <div class="small">공포일자: {law.get('promulg','')}</div>
-  <div style="margin-top:8px;">
-    <a href="{law['lawgo_link']}" target="_blank">원문 보기(법령정보센터)</a>
-  </div>
-</div>
-""",
-                unsafe_allow_html=True,
-            )
+        st.markdown("".join(law["_card_html"] for law in laws), unsafe_allow_html=True)
 
         # 조문 가져오기
         st.markdown("#### 🔍 조문(요약/확인용) — 선택 법령 1개 기준")
         pick = st.selectbox(
             "조문을 가져올 법령 선택",
-            options=list(range(len(st.session_state.last_laws))),
-            format_func=lambda idx: st.session_state.last_laws[idx]["name"],
+            options=list(range(len(laws))),
+            format_func=lambda idx: laws[idx]["name"],
         )
         if st.button("📌 선택 법령 조문 불러오기", use_container_width=True):
-            law = st.session_state.last_laws[pick]
+            law = laws[pick]
             with st.spinner("조문 불러오는 중..."):
                 try:
                     with Timer("drf_law_service"):
-                        service = drf_law_service(cfg.law_api_id, law["mst"])
-                    arts = extract_articles(service, max_articles=30)
+                        arts = law_articles(cfg.law_api_id, law["mst"], max_articles=30)
                     st.session_state.selected_law = law
                     st.session_state.selected_articles = arts
                     if not arts:
@@ -584,85 +958,63 @@ with right:
                     else:
                         st.success(f"조문 {len(arts)}개 로드")
                 except Exception as e:
+                    import traceback  # 에러 경로에서만 필요
                     st.error(f"조문 로드 실패: {e}")
                     st.code(traceback.format_exc())
+            gc_after_action()
 
-    # 조문 표시
-    if st.session_state.selected_law:
-        st.markdown("### 🧾 조문(클릭해서 원문 확인 권장)")
-        law = st.session_state.selected_law
-        st.markdown(f"**선택 법령:** {law['name']}  \n[원문 열기]({law['lawgo_link']})")
-
-        if st.session_state.selected_articles:
-            for a in st.session_state.selected_articles:
-                title = f"제{a.get('no','?')}조 {a.get('title','')}".strip()
-                with st.expander(title):
-                    st.write(a.get("text", "")[:5000] if a.get("text") else "(내용 없음)")
-        else:
-            st.info("조문을 불러오지 않았거나, 구조 차이로 파싱이 비었습니다. 위 원문 링크로 확인하세요.")
-
-    # 사례 표시
-    if st.session_state.last_examples:
-        st.markdown("### 📰 사례(클릭)")
-        for ex in st.session_state.last_examples:
-            st.markdown(
-                f"""
-<div class="card">
-  <div><b>{ex['title']}</b></div>
-  <div class="small">{ex['desc']}</div>
-  <div style="margin-top:8px;">
-    <a href="{ex['link']}" target="_blank">원문 보기</a>
-  </div>
-</div>
-""",
-                unsafe_allow_html=True,
-            )
+    # 조문 표시(선택/로드 결과가 같은 fragment 안에서 바로 갱신되도록 여기서 렌더)
+    render_articles(st.session_state.selected_law, st.session_state.selected_articles)
 
-    # 성능 대시보드
+
+def render_examples(examples: List[Dict[str, str]]):
+    if not examples:
+        return
+    st.markdown("### 📰 사례(클릭)")
+    st.markdown("".join(ex["_card_html"] for ex in examples), unsafe_allow_html=True)
+
+
+@st.fragment
+def render_perf():
     st.markdown("<hr class='sep'/>", unsafe_allow_html=True)
     st.markdown("## ⚡ 성능 대시보드(눈으로 확인)")
+    st.toggle("성능 기록", value=True, key="metrics_on")
 
     ss_init()
     calls = st.session_state.perf["calls"]
-    counters = st.session_state.perf["counters"]
 
     c1, c2, c3 = st.columns(3)
     with c1:
         st.metric("총 호출", str(len(calls)))
     with c2:
-        ok_cnt = sum(1 for x in calls if x["ok"])
+        ok_cnt = sum(1 for _, ok, _ in calls if ok)
         st.metric("성공", str(ok_cnt))
     with c3:
         if calls:
-            st.metric("최근 호출(ms)", f"{calls[-1]['ms']:.1f}")
+            st.metric("최근 호출(ms)", f"{calls[-1][2]:.1f}")
         else:
             st.metric("최근 호출(ms)", "-")
 
     if calls:
+        df = pd.DataFrame(list(calls), columns=["name", "ok", "ms"])
+
         # 평균/최대 타이밍 테이블
-        by_name: Dict[str, List[float]] = {}
-        for x in calls:
-            by_name.setdefault(x["name"], []).append(float(x["ms"]))
-        rows = []
-        for name, arr in by_name.items():
-            rows.append(
-                {
-                    "name": name,
-                    "count": len(arr),
-                    "avg_ms": sum(arr) / len(arr),
-                    "max_ms": max(arr),
-                }
-            )
-        rows = sorted(rows, key=lambda r: r["avg_ms"], reverse=True)
-        st.dataframe(rows, use_container_width=True)
+        agg = (
+            df.groupby("name", sort=False)["ms"]
+            .agg(count="count", avg_ms="mean", max_ms="max")
+            .sort_values("avg_ms", ascending=False)
+            .reset_index()
+        )
+        st.dataframe(agg, use_container_width=True, hide_index=True)
 
         # 라인차트(최근 30개)
-        tail = calls[-30:]
-        st.line_chart(
-            {"ms": [x["ms"] for x in tail]},
-            height=160,
-        )
+        st.line_chart(df["ms"].tail(30).reset_index(drop=True), height=160)
+
+    # 콜백에서 초기화 -> 클릭 후 fragment 재실행 시 이미 비워진 상태로 그려짐(별도 rerun 불필요)
+    st.button("🧹 성능 기록 초기화", on_click=_reset_perf, use_container_width=True)
 
-    if st.button("🧹 성능 기록 초기화", use_container_width=True):
-        st.session_state.perf = {"calls": [], "counters": {}}
-        st.experimental_rerun()
+
+with right:
+    render_laws(st.session_state.last_laws)
+    render_examples(st.session_state.last_examples)
+    render_perf()